@@ -1,3 +1,5 @@
+import os
+
 from sqlalchemy.exc import OperationalError
 
 from nucleus.models import *
@@ -11,15 +13,31 @@ def initialize_database(app, db):
     Args:
         app: Flask app object
 
+    Returns:
+        Souma: The local Souma if the database already contains it, else None
+
     Raises:
         OperationalError: An error occurred updating the database
     """
+    local_souma = None
+
+    # Create database if it doesn't exist yet or access fails
+    if not os.path.exists(app.config["DATABASE"]):
+        # Don't let SQLite replay a write-ahead log left over from a
+        # deleted database into the new one
+        for suffix in ["-wal", "-shm"]:
+            if os.path.exists(app.config["DATABASE"] + suffix):
+                os.remove(app.config["DATABASE"] + suffix)
 
-    # Create database if access fails
-    try:
-        Souma.query.get(app.config["SOUMA_ID"])
-    except OperationalError:
         app.logger.info("Setting up database")
         db.create_all()
+    else:
+        try:
+            local_souma = Souma.query.get(app.config["SOUMA_ID"])
+        except OperationalError:
+            app.logger.info("Setting up database")
+            db.create_all()
 
     # TODO: Update database
+
+    return local_souma
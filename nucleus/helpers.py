@@ -1,7 +1,7 @@
 import logging
 import os
 
-from Crypto.Hash import SHA256
+from hashlib import sha256
 
 
 def configure_app(app, args):
@@ -92,12 +92,16 @@ def _set_souma_id(app):
         # Create new secret key
         app.logger.debug("Creating new secret key")
         app.config['SECRET_KEY'] = os.urandom(24)
-        with open(app.config["SECRET_KEY_FILE"], 'wb') as f:
-            os.chmod(app.config["SECRET_KEY_FILE"], 0700)
+
+        # Create the file with restricted permissions right away. O_BINARY
+        # keeps Windows from translating newline bytes in the key.
+        flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+        fd = os.open(app.config["SECRET_KEY_FILE"], flags, 0600)
+        with os.fdopen(fd, 'wb') as f:
             f.write(app.config['SECRET_KEY'])
 
     # Generate ID used to identify this machine
-    app.config['SOUMA_ID'] = SHA256.new(app.config['SECRET_KEY'] + str(app.config['LOCAL_PORT'])).hexdigest()[:32]
+    app.config['SOUMA_ID'] = sha256(app.config['SECRET_KEY'] + str(app.config['LOCAL_PORT'])).hexdigest()[:32]
 
 
 def _set_password_hash(app):
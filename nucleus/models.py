@@ -18,6 +18,29 @@ from web_ui.helpers import epoch_seconds
 
 request_objects = notification_signals.signal('request-objects')
 
+# SQLite builds before 3.32 accept at most 999 bound parameters per query
+ID_QUERY_BATCH_SIZE = 500
+
+
+def get_by_ids(cls, ids):
+    """Load all objects of a model with an ID in `ids`
+
+    The IDs are queried in batches of ID_QUERY_BATCH_SIZE.
+
+    Args:
+        cls (class): Model class with an `id` column
+        ids (list): IDs of the objects to load
+
+    Returns:
+        dict: Loaded objects by ID. Unknown IDs are left out.
+    """
+    ids = list(ids)
+    rv = dict()
+    for i in xrange(0, len(ids), ID_QUERY_BATCH_SIZE):
+        batch = ids[i:i + ID_QUERY_BATCH_SIZE]
+        rv.update((o.id, o) for o in cls.query.filter(cls.id.in_(batch)))
+    return rv
+
 
 class Serializable():
     """ Make SQLAlchemy models json serializable
@@ -459,6 +482,23 @@ class Persona(Identity):
         electrical = ElectricalSynapse()
         return electrical.get_persona(persona_id)
 
+    @staticmethod
+    def _known_group_ids(groups_changeset):
+        """Return the IDs of Groups in a groups changeset that exist locally
+
+        Args:
+            groups_changeset (list): Group entries with an `id` key
+
+        Returns:
+            set: IDs of the known Groups
+        """
+        group_ids = [group_info["id"] for group_info in groups_changeset]
+        rv = set()
+        for i in xrange(0, len(group_ids), ID_QUERY_BATCH_SIZE):
+            batch = group_ids[i:i + ID_QUERY_BATCH_SIZE]
+            rv.update(g.id for g in Group.query.with_entities(Group.id).filter(Group.id.in_(batch)))
+        return rv
+
     @staticmethod
     def create_from_changeset(changeset, stub=None, update_sender=None, update_recipient=None):
         """See Serializable.create_from_changeset"""
@@ -496,9 +536,9 @@ class Persona(Identity):
             })
 
         # Request unknown groups
+        known_groups = Persona._known_group_ids(changeset["groups"])
         for group_info in changeset["groups"]:
-            group = Group.query.get(group_info["id"])
-            if group is None:
+            if group_info["id"] not in known_groups:
                 request_list.append({
                     "type": "Group",
                     "id": group_info["id"],
@@ -560,9 +600,9 @@ class Persona(Identity):
 
         # Request unknown groups
         if "groups" in changeset:
+            known_groups = Persona._known_group_ids(changeset["groups"])
             for group_info in changeset["groups"]:
-                group = Group.query.get(group_info["id"])
-                if group is None:
+                if group_info["id"] not in known_groups:
                     request_list.append({
                         "type": "Group",
                         "id": group_info["id"],
@@ -592,11 +632,14 @@ class Persona(Identity):
         # contacts get then removed so that the remaining can get deleted
         stale_contacts = set(self.contacts)
 
+        known_contacts = get_by_ids(Persona, [contact["id"] for contact in contact_list])
+
         for contact in contact_list:
-            c = Persona.query.get(contact["id"])
+            c = known_contacts.get(contact["id"])
 
             if c is None:
                 c = Persona(id=contact["id"], _stub=True)
+                known_contacts[c.id] = c
 
             if c._stub is True:
                 request_list.append(contact["id"])
@@ -668,6 +711,13 @@ class Star(Serializable, db.Model):
         'polymorphic_on': kind
     }
 
+    # Serve the universe listing (parent_id, state) and comment and 1up
+    # lookups on a parent Star (parent_id, kind, state)
+    __table_args__ = (
+        db.Index('ix_star_parent_state', 'parent_id', 'state'),
+        db.Index('ix_star_parent_kind_state', 'parent_id', 'kind', 'state'),
+    )
+
     def __repr__(self):
         try:
             ascii_text = self.text.encode('utf-8')
@@ -1452,7 +1502,8 @@ class Souma(Serializable, db.Model):
 t_starmap = db.Table(
     'starmap_index',
     db.Column('starmap_id', db.String(32), db.ForeignKey('starmap.id')),
-    db.Column('star_id', db.String(32), db.ForeignKey('star.id'))
+    db.Column('star_id', db.String(32), db.ForeignKey('star.id')),
+    db.Index('ix_starmap_index_starmap_star', 'starmap_id', 'star_id')
 )
 
 t_starmap_vesicles = db.Table(
@@ -1606,11 +1657,30 @@ class Starmap(Serializable, db.Model):
             data["index"].append({
                 "id": star.id,
                 "modified": star.modified.isoformat(),
-                "author_id": star.author.id
+                "author_id": star.author_id
             })
 
         return data
 
+    @staticmethod
+    def _load_index(index_changeset):
+        """Load the Stars listed in an index changeset and authors of unknown Stars
+
+        Args:
+            index_changeset (list): Index entries with `id` and `author_id` keys
+
+        Returns:
+            tuple: Dict of known Stars by ID and dict of the authors of unknown
+                Stars by ID, used for creating placeholders
+        """
+        known_stars = get_by_ids(Star, [star_changeset["id"] for star_changeset in index_changeset])
+
+        author_ids = set([star_changeset["author_id"] for star_changeset in index_changeset
+            if star_changeset["id"] not in known_stars])
+        star_authors = get_by_ids(Persona, author_ids)
+
+        return known_stars, star_authors
+
     @staticmethod
     def create_from_changeset(changeset, stub=None, update_sender=None, update_recipient=None):
         """Create a new Starmap object from a changeset
@@ -1644,9 +1714,11 @@ class Starmap(Serializable, db.Model):
                 kind=changeset["kind"]
             )
 
+        known_stars, star_authors = Starmap._load_index(changeset["index"])
+
         request_list = list()
         for star_changeset in changeset["index"]:
-            star = Star.query.get(star_changeset["id"])
+            star = known_stars.get(star_changeset["id"])
             star_changeset_modified = iso8601.parse_date(star_changeset["modified"]).replace(tzinfo=None)
 
             if star is None or star.get_state() == -1 or star.modified < star_changeset_modified:
@@ -1658,7 +1730,7 @@ class Starmap(Serializable, db.Model):
                 })
 
                 if star is None:
-                    star_author = Persona.query.get(star_changeset["author_id"])
+                    star_author = star_authors.get(star_changeset["author_id"])
                     if star_author is not None:
                         star = Star(
                             id=star_changeset["id"],
@@ -1667,7 +1739,7 @@ class Starmap(Serializable, db.Model):
                         )
                         star.set_state(-1)
                         db.session.add(star)
-                        db.session.commit()
+                        known_stars[star.id] = star
 
             new_starmap.index.append(star)
 
@@ -1693,11 +1765,15 @@ class Starmap(Serializable, db.Model):
         self.modified = modified
 
         # Update index
-        remove_stars = set([s.id for s in self.index if s is not None])
+        index_ids = set([s.id for s in self.index if s is not None])
+        remove_stars = set(index_ids)
         added_stars = list()
+
+        known_stars, star_authors = Starmap._load_index(changeset["index"])
+
         request_list = list()
         for star_changeset in changeset["index"]:
-            star = Star.query.get(star_changeset["id"])
+            star = known_stars.get(star_changeset["id"])
             star_changeset_modified = iso8601.parse_date(star_changeset["modified"]).replace(tzinfo=None)
 
             if star is not None and star.id in remove_stars:
@@ -1714,7 +1790,7 @@ class Starmap(Serializable, db.Model):
                 })
 
                 if star is None:
-                    star_author = Persona.query.get(star_changeset["author_id"])
+                    star_author = star_authors.get(star_changeset["author_id"])
                     if star_author is not None:
                         star = Star(
                             id=star_changeset["id"],
@@ -1723,10 +1799,13 @@ class Starmap(Serializable, db.Model):
                         )
                         star.set_state(-1)
                         db.session.add(star)
-                        db.session.commit()
+                        known_stars[star.id] = star
 
-            self.index.append(star)
-            added_stars.append(star)
+            # Index is a list, only append stars that are not in it yet
+            if star is not None and star.id not in index_ids:
+                self.index.append(star)
+                index_ids.add(star.id)
+                added_stars.append(star)
 
         for s_id in remove_stars:
             s = Star.query.get(s_id)
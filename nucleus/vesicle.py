@@ -200,16 +200,16 @@ class Vesicle(db.Model):
 
         if reader_persona is None:
             for p in Persona.query.filter('sign_private != ""'):
-                if p.id in keycrypt.keys():
+                if p.id in keycrypt:
                     reader_persona = p
-                    continue
+                    break
 
             if reader_persona is None:
                 raise UnauthorizedError(
                     "Could not decrypt {}. No recipient found in owned personas.\nKeycrypt:{}".format(
                         self, keycrypt.keys()))
         else:
-            if not reader_persona.id in keycrypt.keys():
+            if reader_persona.id not in keycrypt:
                 raise UnauthorizedError("No key found decrypting {} for {}".format(self, reader_persona))
 
         # Retrieve hashcode
@@ -375,7 +375,7 @@ class Vesicle(db.Model):
             ValueError: Unknown protocol version or malformed created timestamp
             KeyError: Missing key in vesicle JSON
             InvalidSignatureError: Does not match author_id's pubkey
-            PersonaNotFoundError: Vesicle author not found
+            PersonaNotFoundError: Vesicle author not found (see load_author)
         """
 
         msg = json.loads(data)
@@ -397,9 +397,7 @@ class Vesicle(db.Model):
             send_attributes.remove('souma_id')
             vesicle.send_attributes = send_attributes
 
-            vesicle.author = Persona.query.get(msg["author_id"])
-            if vesicle.author is None:
-                raise PersonaNotFoundError(msg["author_id"])
+            vesicle.author_id = msg["author_id"]
 
             if "signature" in msg:
                 vesicle.signature = msg["signature"]
@@ -408,8 +406,25 @@ class Vesicle(db.Model):
         except iso8601.ParseError, e:
             raise ValueError("Vesicle malformed: Error parsing date ({})".format(e))
 
-        # Verify signature
-        if vesicle.signature is not None and not vesicle.signed():
-            raise InvalidSignatureError("Invalid signature on {}".format(vesicle))
+        vesicle.load_author()
 
         return vesicle
+
+    def load_author(self):
+        """
+        Load this Vesicle's author from the database and verify its signature
+
+        Raises:
+            InvalidSignatureError: Does not match author_id's pubkey
+            PersonaNotFoundError: Vesicle author not found. The exception's
+                second argument is this Vesicle, so that loading can be retried
+                once the author is available without reading it again.
+        """
+        author = Persona.query.get(self.author_id)
+        if author is None:
+            raise PersonaNotFoundError(self.author_id, self)
+        self.author = author
+
+        # Verify signature
+        if self.signature is not None and not self.signed():
+            raise InvalidSignatureError("Invalid signature on {}".format(self))
@@ -2,8 +2,15 @@
 Script to install Souma on OsX, Windows, and Unix
 
 Usage:
+    python package.py bdist_esky
     python package.py py2app
+    python package.py py2app --dev
     python package.py py2exe
+
+Passing --dev to py2app builds a semi-standalone alias bundle on OsX, which
+is much faster to build but only runs on the machine it was built on. It
+can't be used with bdist_esky, as an alias bundle only links to the source
+tree and can't be frozen.
 """
 import ez_setup
 import numpy  # important for py2exe to work
@@ -11,6 +18,7 @@ ez_setup.use_setuptools()
 
 import sys
 import os
+import subprocess
 from esky.bdist_esky import Executable
 from setuptools import setup
 
@@ -19,13 +27,27 @@ if sys.platform == 'win32':
 
 APP = ['run.py', ]
 
+# setuptools doesn't know this option, remove it before calling setup()
+DEV_BUILD = "--dev" in sys.argv
+if DEV_BUILD:
+    sys.argv.remove("--dev")
+    if "bdist_esky" in sys.argv:
+        sys.exit("--dev builds can't be frozen with bdist_esky, use py2app instead")
+
 """ Read current version identifier as recorded in `souma/__init__.py` """
 with open("__init__.py", 'rb') as f:
     VERSION = f.readline().split("=")[1].strip().replace('"', '')
 
+""" Read package metadata once for all setuptools commands """
+with open("README.md") as f:
+    LONG_DESCRIPTION = f.read()
+
+with open("requirements.txt") as f:
+    REQUIREMENTS = [l.strip() for l in f if l.strip() and not l.startswith("#")]
+
 """ Compile list of static files """
 with open(".gitignore") as f:
-    ignorefiles = [l.strip() for l in f.readlines()]
+    ignorefiles = [l.strip() for l in f]
 
 DATA_FILES = [('', ['__init__.py'])]
 for datadir in ['templates', 'static']:
@@ -33,12 +55,12 @@ for datadir in ['templates', 'static']:
         DATA_FILES.append((root, [os.path.join(root, fn) for fn in files if fn not in ignorefiles]))
 
 """ Modules imported using import() need to be manually specified here """
+# SQLAlchemy is listed in "packages" below so it is copied as a whole
+# instead of resolving each of its dynamically imported submodules
 INCLUDES = [
     "web_ui",
     "argparse",
     "jinja2.ext",
-    "sqlalchemy.dialects.sqlite",
-    "sqlalchemy.ext.declarative",
     "wtforms.ext",
     "wtforms.ext.csrf",
     "flask",
@@ -51,102 +73,6 @@ INCLUDES = [
     "flaskext.uploads",
     "flask_misaka",
     "flask_wtf",
-    "sqlalchemy.orm",
-    "sqlalchemy.event",
-    "sqlalchemy.ext.declarative",
-    "sqlalchemy.engine.url",
-    "sqlalchemy.connectors.mxodbc",
-    "sqlalchemy.connectors.mysqldb",
-    "sqlalchemy.connectors.zxJDBC",
-    "sqlalchemy.dialects.sqlite.base",
-    "sqlalchemy.dialects.sybase.base",
-    "sqlalchemy.dialects.sybase.mxodbc",
-    "sqlalchemy.engine.base",
-    "sqlalchemy.engine.default",
-    "sqlalchemy.engine.interfaces",
-    "sqlalchemy.engine.reflection",
-    "sqlalchemy.engine.result",
-    "sqlalchemy.engine.strategies",
-    "sqlalchemy.engine.threadlocal",
-    "sqlalchemy.engine.url",
-    "sqlalchemy.engine.util",
-    "sqlalchemy.event.api",
-    "sqlalchemy.event.attr",
-    "sqlalchemy.event.base",
-    "sqlalchemy.event.legacy",
-    "sqlalchemy.event.registry",
-    "sqlalchemy.events",
-    "sqlalchemy.exc",
-    "sqlalchemy.ext.associationproxy",
-    "sqlalchemy.ext.automap",
-    "sqlalchemy.ext.compiler",
-    "sqlalchemy.ext.declarative.api",
-    "sqlalchemy.ext.declarative.base",
-    "sqlalchemy.ext.declarative.clsregistry",
-    "sqlalchemy.ext.horizontal_shard",
-    "sqlalchemy.ext.hybrid",
-    "sqlalchemy.ext.instrumentation",
-    "sqlalchemy.ext.mutable",
-    "sqlalchemy.ext.orderinglist",
-    "sqlalchemy.ext.serializer",
-    "sqlalchemy.inspection",
-    "sqlalchemy.interfaces",
-    "sqlalchemy.log",
-    "sqlalchemy.orm.attributes",
-    "sqlalchemy.orm.base",
-    "sqlalchemy.orm.collections",
-    "sqlalchemy.orm.dependency",
-    "sqlalchemy.orm.deprecated_interfaces",
-    "sqlalchemy.orm.descriptor_props",
-    "sqlalchemy.orm.dynamic",
-    "sqlalchemy.orm.evaluator",
-    "sqlalchemy.orm.events",
-    "sqlalchemy.orm.exc",
-    "sqlalchemy.orm.identity",
-    "sqlalchemy.orm.instrumentation",
-    "sqlalchemy.orm.interfaces",
-    "sqlalchemy.orm.loading",
-    "sqlalchemy.orm.mapper",
-    "sqlalchemy.orm.path_registry",
-    "sqlalchemy.orm.persistence",
-    "sqlalchemy.orm.properties",
-    "sqlalchemy.orm.query",
-    "sqlalchemy.orm.relationships",
-    "sqlalchemy.orm.scoping",
-    "sqlalchemy.orm.session",
-    "sqlalchemy.orm.state",
-    "sqlalchemy.orm.strategies",
-    "sqlalchemy.orm.strategy_options",
-    "sqlalchemy.orm.sync",
-    "sqlalchemy.orm.unitofwork",
-    "sqlalchemy.orm.util",
-    "sqlalchemy.pool",
-    "sqlalchemy.processors",
-    "sqlalchemy.schema",
-    "sqlalchemy.sql.annotation",
-    "sqlalchemy.sql.base",
-    "sqlalchemy.sql.compiler",
-    "sqlalchemy.sql.ddl",
-    "sqlalchemy.sql.default_comparator",
-    "sqlalchemy.sql.dml",
-    "sqlalchemy.sql.elements",
-    "sqlalchemy.sql.expression",
-    "sqlalchemy.sql.functions",
-    "sqlalchemy.sql.naming",
-    "sqlalchemy.sql.operators",
-    "sqlalchemy.sql.schema",
-    "sqlalchemy.sql.selectable",
-    "sqlalchemy.sql.sqltypes",
-    "sqlalchemy.sql.type_api",
-    "sqlalchemy.sql.util",
-    "sqlalchemy.sql.visitors",
-    "sqlalchemy.types",
-    "sqlalchemy.util._collections",
-    "sqlalchemy.util.compat",
-    "sqlalchemy.util.deprecations",
-    "sqlalchemy.util.langhelpers",
-    "sqlalchemy.util.queue",
-    "sqlalchemy.util.topological",
     "flask_sqlalchemy._compat",
     "gzip",
     "gevent",
@@ -165,7 +91,7 @@ WIN_OPTIONS = {
     "dist_dir": "../dist",
     "includes": INCLUDES,
     "iconfile": "static/images/icon_win.ico",
-    "packages": ["nucleus", "web_ui", "synapse", "requests"],
+    "packages": ["nucleus", "web_ui", "synapse", "requests", "sqlalchemy"],
     "dll_excludes": [],
     'bundle_files': 1
 }
@@ -176,7 +102,7 @@ DARWIN_OPTIONS = {
     "dist_dir": "../dist",
     "iconfile": "static/images/icon_osx.icns",
     "includes": INCLUDES,
-    "packages": ["nucleus", "web_ui", "synapse", "requests"],
+    "packages": ["nucleus", "web_ui", "synapse", "requests", "sqlalchemy"],
     "site_packages": True,
     "plist": {
         "CFBundleVersion": VERSION,
@@ -185,22 +111,24 @@ DARWIN_OPTIONS = {
     },
 }
 
+# Link against the system Python and source files instead of copying them
+DARWIN_DEV_OPTIONS = dict(DARWIN_OPTIONS,
+    semi_standalone=True,
+    alias=True,
+    site_packages=False)
+
 """ Platform specific options """
 if sys.platform == 'darwin':
     # Compile .less files
     filenames = ["main", ]
     for fn in filenames:
-        rv = os.system("touch ./static/css/{}.css".format(fn))
-        rv += os.system("lesscpy ./static/css/{fn}.less > ./static/css/{fn}.css".format(fn=fn))
+        with open("./static/css/{}.css".format(fn), "w") as f:
+            subprocess.call(["lesscpy", "./static/css/{}.less".format(fn)], stdout=f)
 
     """ Patch gevent implicit loader """
-    patched = False
     with open("../lib/python2.7/site-packages/gevent/os.py", "r+") as f:
         patch = "\n# make os.path available here\nmy_os = __import__('os')\npath = my_os.path\n"
-        for line in f.readlines():
-            if line == "# make os.path available here":
-                patched = True
-        if not patched:
+        if "# make os.path available here" not in f.read():
             f.write(patch)
 
     """ Setup Esky Executable """
@@ -217,13 +145,12 @@ if sys.platform == 'darwin':
             bdist_esky=dict(
                 freezer_module="py2app",
                 freezer_options=DARWIN_OPTIONS
-            )
+            ),
+            py2app=DARWIN_DEV_OPTIONS if DEV_BUILD else DARWIN_OPTIONS
         ),
         scripts=[exe, ]
     )
 
-    install_requires = open('requirements.txt').read()
-
 elif sys.platform == 'win32':
     """ Setup Esky Executable """
     exe = Executable("run.py",
@@ -253,15 +180,10 @@ elif sys.platform == 'win32':
     except:
         flaskext_init = open(flaskext.__path__[0] + '\\__init__.py', 'w')
         flaskext_init.close()
-
-    with open('requirements.txt') as f:
-        install_requires = [req.strip() for req in f.readlines()]
 else:
     extra_options = dict(
         scripts=APP)
 
-    install_requires = open('requirements.txt').read()
-
 setup(
     name="Souma",
     version=VERSION,
@@ -272,7 +194,7 @@ setup(
     data_files=DATA_FILES,
     license="Apache License 2.0",
     description="A Cognitive Network for Groups",
-    long_description=open("README.md").read(),
-    install_requires=install_requires,
+    long_description=LONG_DESCRIPTION,
+    install_requires=REQUIREMENTS,
     **extra_options
 )
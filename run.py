@@ -2,13 +2,13 @@
 
 import os
 import sys
-import webbrowser
 import semantic_version
 import argparse
 
 from web_ui import app, db
 
 from gevent import Greenlet, monkey
+from gevent.pool import Pool
 from gevent.wsgi import WSGIServer
 from gevent.event import Event
 from sqlalchemy.exc import OperationalError
@@ -77,10 +77,6 @@ if getattr(sys, 'frozen', None) == 'macosx_app':
         imp.load_module = custom_load_module
         imp.find_module = custom_find_module
 
-        # Verify that the patch is working properly (you can remove these lines safely)
-        __httplib__ = imp.load_module('__httplib__', *imp.find_module('httplib'))
-        assert __httplib__ is httplib
-
 
 """ Initialize database """
 start = True
@@ -89,7 +85,7 @@ local_souma = None
 from nucleus.database import initialize_database
 
 try:
-    initialize_database(app, db)
+    local_souma = initialize_database(app, db)
 except OperationalError, e:
     app.logger.error("An operational error occured while updating the local database. " +
         "If you do already have data in it you should make a backup and then" +
@@ -97,9 +93,7 @@ except OperationalError, e:
             app.config["USER_DATA"], e))
     start = False
 
-
-local_souma = Souma.query.get(app.config["SOUMA_ID"])
-if local_souma is None:
+if start and local_souma is None:
     app.logger.info("Setting up Nucleus for <Souma [{}]>".format(app.config['SOUMA_ID'][:6]))
     local_souma = Souma(id=app.config['SOUMA_ID'], version=app.config["VERSION"])
     local_souma.generate_keys()
@@ -109,7 +103,7 @@ if local_souma is None:
     db.session.commit()
     start = True
 
-elif local_souma.version < semantic_version.Version(app.config["VERSION"]):
+elif local_souma is not None and local_souma.version < semantic_version.Version(app.config["VERSION"]):
     app.logger.error("""Local Souma data is outdated (local Souma {} < codebase {}
         You should reset all user data with `-r` or delete it from `{}`""".format(
         local_souma.version, app.config["VERSION"], app.config["USER_DATA"]))
@@ -127,13 +121,17 @@ if start:
 
         # Web UI
         if not app.config['NO_UI']:
-            # Compile less when running from console
+            # Compile less when running from console. This runs in the
+            # background so the server and browser can start right away.
             if host_kind() == "":
-                compile_less()
+                Greenlet.spawn(compile_less)
 
             app.logger.info("Starting Web-UI")
-            local_server = WSGIServer(('', app.config['LOCAL_PORT']), app)
+            local_server = WSGIServer(('', app.config['LOCAL_PORT']), app,
+                spawn=Pool(app.config['WSGI_POOL_SIZE']))
             local_server.start()
+
+            import webbrowser
             webbrowser.open("http://{}/".format(app.config["LOCAL_ADDRESS"]))
 
         # Synapse
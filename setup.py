@@ -22,6 +22,12 @@ import sys
 
 APP = ['run.py']
 
+with open("README") as f:
+    LONG_DESCRIPTION = f.read()
+
+with open("requirements.txt") as f:
+    REQUIREMENTS = [l.strip() for l in f if l.strip() and not l.startswith("#")]
+
 
 """ Platform specific options """
 if sys.platform == 'darwin':
@@ -47,7 +53,7 @@ setup(
     packages=["nucleus", "web_ui", "synapse"],
     license="Apache License 2.0",
     description="A Cognitive Network for Groups",
-    long_description=open("README").read(),
-    install_requires=open("requirements_osx.txt").read(),
+    long_description=LONG_DESCRIPTION,
+    install_requires=REQUIREMENTS,
     **extra_options
 )
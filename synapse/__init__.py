@@ -1,10 +1,11 @@
 import logging
 import json
+import iso8601
 
-from dateutil.parser import parse as dateutil_parse
+from collections import deque
 from uuid import uuid4
 
-from nucleus import create_session, notification_signals, PersonaNotFoundError, UnauthorizedError, VesicleStateError, CHANGE_TYPES
+from nucleus import create_session, notification_signals, PersonaNotFoundError, UnauthorizedError, CHANGE_TYPES
 from nucleus.models import Persona, Star, Planet, Starmap, Group, Oneup
 from nucleus.vesicle import Vesicle
 from synapse.electrical import ElectricalSynapse
@@ -16,7 +17,20 @@ ALLOWED_MESSAGE_TYPES = [
     "object_request",
 ]
 
-OBJECT_TYPES = ("Star", "Planet", "Persona", "Starmap", "Group", "Oneup")
+# Model classes that can be transmitted in object Vesicles, by type name
+OBJECT_CLASSES = {
+    "Star": Star,
+    "Planet": Planet,
+    "Persona": Persona,
+    "Starmap": Starmap,
+    "Group": Group,
+    "Oneup": Oneup
+}
+
+OBJECT_TYPES = tuple(OBJECT_CLASSES.keys())
+
+# Number of handled Vesicle IDs to remember for skipping duplicates
+RECENT_VESICLES = 1000
 
 
 class Synapse():
@@ -37,8 +51,15 @@ class Synapse():
         self.logger = logging.getLogger('synapse')
         self.logger.setLevel(app.config['LOG_LEVEL'])
 
-        # Core setup
-        self.starmap = Starmap.query.get(app.config['SOUMA_ID'])
+        # Handlers for received Vesicles by message type and objects by action
+        self._vesicle_handlers = dict(
+            (t, getattr(self, "handle_{}".format(t))) for t in ALLOWED_MESSAGE_TYPES)
+        self._object_handlers = dict(
+            (a, getattr(self, "object_{}".format(a))) for a in CHANGE_TYPES)
+
+        # IDs of recently handled Vesicles, oldest first
+        self._recent_vesicles = deque()
+        self._recent_vesicle_ids = set()
 
         # Connect to glia
         self.electrical = ElectricalSynapse(parent=self)
@@ -75,12 +96,10 @@ class Synapse():
             len(recipients) if recipients is not None else "0",
             "via Myelin" if app.config["ENABLE_MYELIN"] else ""))
 
-        if not hasattr(vesicle, "author"):
+        if vesicle.author is None:
             raise ValueError("Can't send Vesicle without defined author")
 
         if vesicle.encrypted():
-            keycrypt = json.loads(vesicle.keycrypt)
-
             # First remove everyone from keycrypt that is not a current recipient
             keycrypt = json.loads(vesicle.keycrypt)
             remove_recipients = set(keycrypt.keys()) - set([r.id for r in recipients])
@@ -96,16 +115,35 @@ class Synapse():
         else:
             vesicle.encrypt(recipients=recipients)
 
-        try:
+        # The signature only covers the payload, which is not changed by
+        # adding recipients to an encrypted Vesicle
+        if vesicle.signature is None:
             vesicle.sign()
-        except VesicleStateError:
-            self.logger.info("{} was already signed".format(vesicle))
+        else:
+            self.logger.debug("{} was already signed".format(vesicle))
 
         if app.config["ENABLE_MYELIN"]:
             self.electrical.myelin_store(vesicle)
 
         return vesicle
 
+    def _remember_vesicle(self, vesicle_id):
+        """Add a Vesicle ID to the list of recently handled Vesicles
+
+        Only the last RECENT_VESICLES IDs are kept.
+
+        Args:
+            vesicle_id (String): ID of the handled Vesicle
+        """
+        if vesicle_id in self._recent_vesicle_ids:
+            return
+
+        if len(self._recent_vesicles) >= RECENT_VESICLES:
+            self._recent_vesicle_ids.discard(self._recent_vesicles.popleft())
+
+        self._recent_vesicles.append(vesicle_id)
+        self._recent_vesicle_ids.add(vesicle_id)
+
     def _find_source(self, obj):
         """Return a list of possible sources for object.
 
@@ -193,7 +231,7 @@ class Synapse():
         if errors:
             self.logger.error("Malformed object received\n{}".format("\n".join(errors)))
         else:
-            handler = getattr(self, "object_{}".format(action))
+            handler = self._object_handlers[action]
             new_obj = handler(author, reader_persona, object_type, obj, session)
 
             if new_obj is not None:
@@ -231,7 +269,7 @@ class Synapse():
             self._log_errors("Received invalid object request", errors)
         else:
             # Load object
-            obj_class = globals()[object_type]
+            obj_class = OBJECT_CLASSES[object_type]
             obj = obj_class.query.get(object_id)
 
             if obj is None:
@@ -276,10 +314,15 @@ class Synapse():
                 self.logger.warning("Could not retrieve unknown Persona from server:\n{}".format(", ".join(errors)))
                 return
             else:
-                vesicle = Vesicle.read(data)
+                # Vesicle has been read already, only author and signature are left
+                vesicle = e[1]
+                vesicle.load_author()
 
         if vesicle is None:
             self.logger.error("Failed handling Vesicle due to decoding error")
+        elif vesicle.id in self._recent_vesicle_ids:
+            # Skip decrypting and storing Vesicles that were handled already
+            self.logger.debug("{} was already handled".format(vesicle))
         else:
             old_vesicle = Vesicle.query.get(vesicle.id)
             if old_vesicle is not None:
@@ -305,13 +348,14 @@ class Synapse():
 
             if not vesicle.decrypted():
                 self.logger.debug("{} has encrypted payload.".format(vesicle))
-            else:
+            elif self.logger.isEnabledFor(logging.INFO):
+                # Only pretty-print the payload if it is actually logged
                 self.logger.info("{} has payload:\n{}".format(vesicle, json.dumps(vesicle.data, indent=2)))
 
             # Call handler depending on message type
             try:
-                if vesicle is not None and not vesicle.handled and vesicle.message_type in ALLOWED_MESSAGE_TYPES:
-                    handler = getattr(self, "handle_{}".format(vesicle.message_type))
+                if vesicle is not None and not vesicle.handled and vesicle.message_type in self._vesicle_handlers:
+                    handler = self._vesicle_handlers[vesicle.message_type]
                     try:
                         handler(vesicle, reader_persona, session)
                     except UnauthorizedError, e:
@@ -322,11 +366,14 @@ class Synapse():
             finally:
                 session.flush()
 
+            if vesicle.handled:
+                self._remember_vesicle(vesicle.id)
+
         return vesicle
 
     def object_insert(self, author, recipient, object_type, obj, session):
         # Handle answer
-        obj_class = globals()[object_type]
+        obj_class = OBJECT_CLASSES[object_type]
         missing_keys = obj_class.validate_changeset(obj)
         if len(missing_keys) > 0:
             raise KeyError("Missing '{}' for creating {} from changeset".format(
@@ -351,12 +398,12 @@ class Synapse():
 
     def object_update(self, author, recipient, object_type, obj, session):
         # Verify message
-        obj_class = globals()[object_type]
+        obj_class = OBJECT_CLASSES[object_type]
         missing_keys = obj_class.validate_changeset(obj, update=True)
         if len(missing_keys) > 0:
             raise KeyError("Missing '{}' for updating {} from changeset".format(obj_class.__name__))
 
-        obj_modified = dateutil_parse(obj["modified"])
+        obj_modified = iso8601.parse_date(obj["modified"]).replace(tzinfo=None)
 
         # Retrieve local object copy
         o = obj_class.query.get(obj["id"])
@@ -393,12 +440,11 @@ class Synapse():
 
     def object_delete(self, author, recipient, object_type, obj, session):
         # Verify message
-        obj_class = globals()[object_type]
+        obj_class = OBJECT_CLASSES[object_type]
         for k in ["id", "modified"]:
             if k not in obj.keys():
                 raise KeyError("Missing '{}' for deleting {} from changeset".format(k, obj_class.__name__))
 
-        # Get the object's class from globals
         o = obj_class.query.get(obj["id"])
 
         if o is None:
@@ -461,8 +507,7 @@ class Synapse():
         if message["object_type"] not in OBJECT_TYPES:
             raise ValueError("Object type {} not supported".format(message["object_type"]))
 
-        # Get the object's class from globals
-        obj_class = globals()[message["object_type"]]
+        obj_class = OBJECT_CLASSES[message["object_type"]]
         obj = obj_class.query.get(message["object_id"])
 
         if obj is None:
@@ -510,7 +555,8 @@ class Synapse():
             session.rollback()
             raise
         else:
-            self.logger.info("Local {} changed: Distributing {}\n{}".format(obj, vesicle, vesicle.json(indent=True)))
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info("Local {} changed: Distributing {}\n{}".format(obj, vesicle, vesicle.json(indent=True)))
             vesicle = self._distribute_vesicle(vesicle, recipients=recipients)
 
         session.add(vesicle)
@@ -567,7 +613,7 @@ class Synapse():
         Raises:
             UnauthorizedError: If no source can be found that has one of the controlled Personas as a contact
         """
-        obj_class = globals()[object_type]
+        obj_class = OBJECT_CLASSES[object_type]
         obj = obj_class.query.get(object_id)
 
         # Find a source if none is specified
@@ -7,7 +7,6 @@ import os
 
 from base64 import b64encode
 from Crypto import Random
-from dateutil.parser import parse as dateutil_parse
 from gevent import Greenlet
 from hashlib import sha256
 from humanize import naturaltime
@@ -132,7 +131,7 @@ class ElectricalSynapse(object):
         if session_id is None:
             del self._sessions[persona.id]
         else:
-            to = dateutil_parse(timeout)
+            to = iso8601.parse_date(timeout).replace(tzinfo=None)
 
             self._sessions[persona.id] = {
                 'id': session_id,
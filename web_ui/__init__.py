@@ -1,5 +1,6 @@
 import os
 import sys
+import sqlite3
 import logging
 
 from logging.handlers import RotatingFileHandler
@@ -8,6 +9,8 @@ from flask.ext import uploads
 from flask.ext.misaka import Misaka
 from flask.ext.sqlalchemy import SQLAlchemy
 from humanize import naturaltime
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from werkzeug.contrib.cache import SimpleCache
 
 from web_ui.helpers import localtime
@@ -21,6 +24,20 @@ db = SQLAlchemy(app)
 # Load configuration
 app.config.from_object("web_ui.default_config")
 
+
+@event.listens_for(Engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Use write-ahead logging on SQLite connections
+
+    This needs one fsync per commit instead of two. The engine is created
+    lazily with the final database URI, so this is set up as a listener.
+    """
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
 app.jinja_env.filters['naturaltime'] = naturaltime
 app.jinja_env.filters['localtime'] = lambda value: localtime(value, tzval=app.config["TIMEZONE"])
 
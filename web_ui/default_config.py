@@ -30,6 +30,9 @@ LOCAL_ADDRESS = "{}:{}".format(LOCAL_HOSTNAME, LOCAL_PORT)
 DEBUG = False
 USE_DEBUG_SERVER = False
 
+# Maximum number of requests the web ui server handles concurrently
+WSGI_POOL_SIZE = 200
+
 TIMEZONE = 'Europe/Berlin'
 
 SECRET_KEY_FILE = os.path.join(USER_DATA, "secret_key_{}.dat".format(LOCAL_PORT))
@@ -59,6 +62,10 @@ LOG_FORMAT = (
 
 LAYOUT_DEFINITIONS = dict()
 
+# Interval in seconds at which layouts.json is checked for changes when
+# running from the console
+LAYOUT_POLL_INTERVAL = 1
+
 LESS_FILENAMES = ["main"]
 
 #
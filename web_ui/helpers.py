@@ -11,6 +11,10 @@ from datetime import datetime
 epoch = datetime.utcfromtimestamp(0)
 epoch_seconds = lambda dt: (dt - epoch).total_seconds() - 1356048000
 
+# Requests session used by find_links. Created on first use so that
+# importing this module doesn't pull in requests.
+_links_session = None
+
 
 def allowed_file(filename):
     from web_ui import app
@@ -47,6 +51,16 @@ def reset_userdata():
         else:
             app.logger.warning("RESET: {} {} deleted".format(fileid, app.config[fileid]))
 
+    # SQLite would replay a leftover write-ahead log into the new database
+    for suffix in ["-wal", "-shm"]:
+        try:
+            os.remove(app.config["DATABASE"] + suffix)
+        except OSError:
+            pass
+        else:
+            app.logger.warning("RESET: DATABASE{} {} deleted".format(
+                suffix, app.config["DATABASE"] + suffix))
+
 
 def localtime(value, tzval="UTC"):
     """Convert tz-naive UTC datetime into tz-naive local datetime
@@ -61,21 +75,64 @@ def localtime(value, tzval="UTC"):
     return value
 
 
+def replace_file(src, dst):
+    """Move file src to dst, replacing dst if it exists
+
+    On POSIX systems dst is replaced atomically.
+
+    Args:
+        src (str): Path of the file to move
+        dst (str): Path of the file to replace
+    """
+    if os.name == "nt" and os.path.exists(dst):
+        # Windows can't rename over an existing file
+        os.remove(dst)
+    os.rename(src, dst)
+
+
 def compile_less(filenames=None):
     """Compile all less files that are newer than their css counterparts.
 
     Args:
         filenames (list): List of .less files in `static/css/` dir
     """
+    # gevent's subprocess lets other greenlets run while lesscpy works
+    from gevent import subprocess
+
     if filenames is None:
         from web_ui import app
         filenames = app.config["LESS_FILENAMES"]
 
+    # Stylesheets may import each other, so any changed .less file
+    # invalidates all compiled css
+    less_mtime = max([os.path.getmtime(os.path.join("static/css", l))
+        for l in os.listdir("static/css") if l.endswith(".less")] or [0])
+
+    rv = 0
     for fn in filenames:
+        css_path = "static/css/{}.css".format(fn)
+        if os.path.exists(css_path) and os.path.getmtime(css_path) >= less_mtime:
+            continue
+
         logging.info("Compiling {}.less".format(fn))
 
-        rv = os.system("touch static/css/{}.css".format(fn))
-        rv += os.system("lesscpy static/css/{fn}.less > static/css/{fn}.css".format(fn=fn))
+        # Compile into a temporary file so that pages requested meanwhile
+        # still get the previous stylesheet
+        tmp_path = "{}.tmp".format(css_path)
+        with open(tmp_path, "w") as f:
+            try:
+                file_rv = subprocess.call(["lesscpy", "static/css/{}.less".format(fn)], stdout=f)
+            except OSError, e:
+                logging.error("Could not run lesscpy: {}".format(e))
+                file_rv = 1
+
+        # Failed output would be newer than the .less files and never be
+        # compiled again, keep the previous css instead
+        if file_rv == 0:
+            replace_file(tmp_path, css_path)
+        else:
+            os.remove(tmp_path)
+            rv += 1
 
     if rv > 0:
         logging.error("Compilation of LESS stylesheets failed.")
@@ -97,6 +154,11 @@ def find_links(text):
 
     from web_ui import app
 
+    # Reuse connections between link checks
+    global _links_session
+    if _links_session is None:
+        _links_session = requests.Session()
+
     # Everything that looks remotely like a URL
     expr = "(https?://[\S]+)"
     rv = list()
@@ -107,7 +169,7 @@ def find_links(text):
         for c in candidates:
             app.logger.info("Testing potential link '{}' for availability".format(c))
             try:
-                res = requests.head(c, timeout=15.0)
+                res = _links_session.head(c, timeout=15.0)
             except requests.exceptions.RequestException:
                 pass
             else:
@@ -174,6 +236,7 @@ def watch_layouts(continuous=True):
         mtime_last = mtime_cur
 
         cont = True if continuous is True else False
-        sleep(1)
+        if cont:
+            sleep(app.config["LAYOUT_POLL_INTERVAL"])
 
     return app.config["LAYOUT_DEFINITIONS"]
@@ -1,7 +1,7 @@
 from operator import itemgetter
 
 from web_ui import app
-from web_ui.helpers import watch_layouts
+from web_ui.helpers import watch_layouts, host_kind
 
 from gevent import Greenlet
 
@@ -24,8 +24,11 @@ class PageManager(object):
         # Dimension of layout in cells
         self.screen_size = (12.0, 8.0)
 
-        # Load layouts once and then continuously update them
-        Greenlet.spawn(watch_layouts)
+        # Load layouts once and then continuously update them. Packaged apps
+        # ship a fixed layouts.json, so they only load it once on demand
+        # (see _get_layouts_for)
+        if host_kind() == "":
+            Greenlet.spawn(watch_layouts)
 
         # Number of items on one page
         # Flask-SQLAlchemy pagination requires this to be static, i.e.
@@ -33,6 +36,10 @@ class PageManager(object):
         # pages. If we need that, we will have to implement our own pagination.
         self.page_size = 7
 
+        # Cell scores only depend on cell geometry, so they are cached
+        # across requests (see _cell_score)
+        self._cell_scores = dict()
+
     def _add_static_section(self, page, section, layout):
         # if section contains only one cell it's not a list
         if not isinstance(layout[section][0], list):
@@ -50,6 +57,10 @@ class PageManager(object):
 
         import math
 
+        key = tuple(cell)
+        if key in self._cell_scores:
+            return self._cell_scores[key]
+
         # position score
         if cell[0] > self.screen_size[0] or cell[1] > self.screen_size[1]:
             pscore = 0.0
@@ -61,7 +72,9 @@ class PageManager(object):
         # size score (sigmoid)
         area = cell[2] * cell[3]
         sscore = 1.0 / (1 + pow(math.exp(1), -0.1 * (area - 12.0)))
-        return pscore * sscore
+
+        self._cell_scores[key] = pscore * sscore
+        return self._cell_scores[key]
 
     def _get_layouts_for(self, context):
         """ Returns all layouts appropriate for context
@@ -1,4 +1,5 @@
 import datetime
+import os
 
 from flask import abort, flash, redirect, render_template, request, session, url_for, jsonify as json_response
 from flask.helpers import send_from_directory
@@ -104,7 +105,11 @@ def setup():
             password = PBKDF2(request.form['password'], salt)
             password_hash = sha256(password).hexdigest()
 
-            with open(app.config["PASSWORD_HASH_FILE"], "w") as f:
+            fd = os.open(app.config["PASSWORD_HASH_FILE"], os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0600)
+            if hasattr(os, "fchmod"):
+                # The mode above only applies to newly created files
+                os.fchmod(fd, 0600)
+            with os.fdopen(fd, "w") as f:
                 f.write(password_hash)
 
             cache.set('password', password, 3600)
@@ -268,7 +273,6 @@ def create_star():
         new_star.text = new_text
 
         db.session.add(new_star)
-        db.session.commit()
 
         flash('New star created!')
         app.logger.info('Created new {}'.format(new_star))
@@ -292,10 +296,6 @@ def create_star():
                 # attach to star
                 assoc = PlanetAssociation(star=new_star, planet=planet, author=author)
                 new_star.planet_assocs.append(assoc)
-
-                # commit
-                db.session.add(new_star)
-                db.session.commit()
                 app.logger.info("Attached {} to new {}".format(planet, new_star))
             else:
                 link_hash = sha256(link.url).hexdigest()[:32]
@@ -309,8 +309,6 @@ def create_star():
 
                 assoc = PlanetAssociation(star=new_star, planet=planet, author=author)
                 new_star.planet_assocs.append(assoc)
-                db.session.add(new_star)
-                db.session.commit()
                 app.logger.info("Attached {} to new {}".format(planet, new_star))
 
         # Add longform text field as attachment
@@ -318,10 +316,11 @@ def create_star():
             planet = TextPlanet.get_or_create(request.form['text'])
             assoc = PlanetAssociation(star=new_star, planet=planet, author=author)
             new_star.planet_assocs.append(assoc)
-            db.session.add(new_star)
-            db.session.commit()
             app.logger.info("Attached {} to new {}".format(planet, new_star))
 
+        # Store the Star together with all its attachments
+        db.session.commit()
+
         model_change_messages.append({
             "author_id": new_star.author.id,
             "action": "insert",